@@ -1,7 +1,20 @@
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Optional
+from dataclasses import dataclass, fields
+from operator import attrgetter
+import asyncio
+import inspect
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from mcp.server.fastmcp import FastMCP
-import requests
+from pydantic import Field
+import httpx
+import orjson
 import os
+import re
 from whatsapp import (
     search_contacts as whatsapp_search_contacts,
     list_messages as whatsapp_list_messages,
@@ -15,28 +28,228 @@ from whatsapp import (
     send_file as whatsapp_send_file,
     send_audio_message as whatsapp_audio_voice_message,
     download_media as whatsapp_download_media,
-    dataclass_to_dict
+    dataclass_to_dict,
+    Message
 )
-import sys
 
-# Configuration from environment variables or defaults
-BRIDGE_BASE_URL = os.environ.get('WHATSAPP_BRIDGE_URL', 'http://localhost:8080')
+@dataclass(frozen=True, slots=True)
+class _Config:
+    bridge_url: str
+    transport: str
+    port: int
+    host: str
+    streamable_path: str
+    strip_docs: bool
 
-# Initialize FastMCP server
-mcp = FastMCP("whatsapp")
+# Configuration from environment variables or defaults, read once at import
+CFG = _Config(
+    bridge_url=os.environ.get('WHATSAPP_BRIDGE_URL', 'http://localhost:8080'),
+    transport=os.environ.get('MCP_TRANSPORT', 'stdio').lower(),
+    port=int(os.environ.get('MCP_PORT', '8300')),
+    host=os.environ.get('MCP_HOST', '0.0.0.0'),
+    streamable_path='/messages',
+    strip_docs=os.environ.get('MCP_STRIP_DOCS') == '1'
+)
+
+# Shared async client for bridge calls; keeps connections alive across tool calls
+_HTTP = httpx.AsyncClient(
+    base_url=CFG.bridge_url,
+    timeout=10.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(
+            max_connections=32,
+            max_keepalive_connections=16,
+            keepalive_expiry=30.0
+        )
+    )
+)
+
+# Pre-encoded request pieces for the fixed scheduled-message actions
+_SCHEDULED_PATH = "/api/scheduled/"
+_JSON_HDR = {"Content-Type": "application/json"}
+_PAUSE_BODY = orjson.dumps({"action": "pause"})
+_RESUME_BODY = orjson.dumps({"action": "resume"})
+
+# Phone number with country code, or a user/group JID
+_RECIPIENT_RE = re.compile(r'\d{7,15}|[\d.:-]+@(?:s\.whatsapp\.net|g\.us|lid)')
+
+# Message is flat, so read its fields directly instead of asdict()'s recursive copy
+_MSG_FIELDS = tuple(f.name for f in fields(Message))
+_MSG_GET = attrgetter(*_MSG_FIELDS)
+
+def _fast_msg_dict(msg: Message) -> Dict[str, Any]:
+    result = dict(zip(_MSG_FIELDS, _MSG_GET(msg)))
+    result['timestamp'] = msg.timestamp.isoformat()
+    return result
+
+@dataclass(slots=True)
+class _CircuitBreaker:
+    """Stop calling the bridge for a while after repeated connection errors or gateway replies."""
+    fail_max: int
+    reset_timeout: float
+    failures: int = 0
+    opened_at: float = 0.0
+    
+    def allow(self) -> bool:
+        # Once reset_timeout has passed, let calls through again; one more failure re-opens
+        return self.failures < self.fail_max or time.monotonic() - self.opened_at >= self.reset_timeout
+    
+    def record(self, healthy: bool) -> None:
+        if healthy:
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.failures >= self.fail_max:
+            self.opened_at = time.monotonic()
+
+_BRIDGE_BREAKER = _CircuitBreaker(fail_max=5, reset_timeout=30.0)
+
+# Replies meaning the bridge itself is unreachable; its other 5xx replies are per-request errors
+_BRIDGE_DOWN_STATUSES = frozenset({502, 503, 504})
+
+def _bridge_error(error: str, e: Exception) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "message": f"{error}: {str(e)}"
+    }
+
+async def _bridge_call(method: str, path: str, error: str, **kwargs) -> Dict[str, Any]:
+    """Call the bridge API and decode its JSON reply, or describe the failure."""
+    if not _BRIDGE_BREAKER.allow():
+        return {
+            "success": False,
+            "message": f"{error}: bridge unavailable"
+        }
+    
+    # Only calls that complete are recorded, so a cancelled call leaves the breaker alone
+    try:
+        response = await _HTTP.request(method, path, **kwargs)
+    except httpx.HTTPError as e:
+        if isinstance(e, httpx.TransportError):
+            _BRIDGE_BREAKER.record(False)
+        return _bridge_error(error, e)
+    
+    _BRIDGE_BREAKER.record(response.status_code not in _BRIDGE_DOWN_STATUSES)
+    try:
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    except (httpx.HTTPError, ValueError) as e:
+        return _bridge_error(error, e)
+
+# Blocking whatsapp.* calls run off the event loop so parallel tool calls overlap;
+# sends share one worker so they reach the bridge one at a time
+_EXEC = ThreadPoolExecutor(max_workers=8, thread_name_prefix="wa")
+_SEND_EXEC = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wa-send")
+
+async def _in_thread(fn, *args, executor: ThreadPoolExecutor = _EXEC):
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+# In-flight read calls, keyed by tool name and arguments
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+async def _singleflight(key: tuple, call):
+    """Share one in-flight call between concurrent identical requests.
+    
+    call is a zero-argument coroutine function; it only runs if no call for key is pending.
+    """
+    pending = _inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(call())
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller being cancelled doesn't cancel the shared call
+    return await asyncio.shield(pending)
+
+# Initialize FastMCP server. Host and path are given here rather than set later so the
+# localhost-only Host/Origin checks are not enabled for a server meant to be reached remotely
+mcp = FastMCP(
+    "whatsapp",
+    host=CFG.host,
+    port=CFG.port,
+    streamable_http_path=CFG.streamable_path
+)
+
+# Short-lived caches for read-heavy chat and contact lookups, keyed on tool arguments
+_CHAT_CACHE = TTLCache(maxsize=512, ttl=30)
+_CONTACT_CACHE = TTLCache(maxsize=512, ttl=30)
+_CACHE_LOCK = threading.RLock()
+
+@cached(_CHAT_CACHE, key=partial(hashkey, 'get_chat'), lock=_CACHE_LOCK)
+def _cached_get_chat(chat_jid: str, include_last_message: bool):
+    return whatsapp_get_chat(chat_jid, include_last_message)
+
+@cached(_CHAT_CACHE, key=partial(hashkey, 'get_direct_chat_by_contact'), lock=_CACHE_LOCK)
+def _cached_get_direct_chat_by_contact(sender_phone_number: str):
+    return whatsapp_get_direct_chat_by_contact(sender_phone_number)
+
+@cached(_CONTACT_CACHE, key=partial(hashkey, 'search_contacts'), lock=_CACHE_LOCK)
+def _cached_search_contacts(query: str):
+    return whatsapp_search_contacts(query)
+
+@cached(_CHAT_CACHE, key=partial(hashkey, 'list_chats'), lock=_CACHE_LOCK)
+def _cached_list_chats(
+    query: Optional[str],
+    limit: int,
+    page: int,
+    include_last_message: bool,
+    sort_by: str
+):
+    return whatsapp_list_chats(
+        query=query,
+        limit=limit,
+        page=page,
+        include_last_message=include_last_message,
+        sort_by=sort_by
+    )
+
+# list_messages pages fetched ahead of time; each is served once and only if asked for
+# soon, so the first page and any page not prefetched always come from the database
+_PAGE_CACHE = TTLCache(maxsize=128, ttl=30)
+
+def _prefetch_message_page(*args) -> None:
+    """Fetch a list_messages page (positional tool arguments) into _PAGE_CACHE."""
+    messages = whatsapp_list_messages(*args)
+    with _CACHE_LOCK:
+        _PAGE_CACHE[args] = messages
+
+@cached(_CHAT_CACHE, key=partial(hashkey, 'get_contact_chats'), lock=_CACHE_LOCK)
+def _cached_get_contact_chats(jid: str, limit: int, page: int):
+    return whatsapp_get_contact_chats(jid, limit, page)
+
+def _prefetch(fn, *args) -> None:
+    """Warm the cache for a likely next page on the worker pool, if a loop is running.
+    
+    fn stores the page in a cache itself, so nothing further is prefetched.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.run_in_executor(_EXEC, fn, *args)
+
+def _invalidate_chat_cache() -> None:
+    """Drop cached chat data after we send something (last message changed)."""
+    with _CACHE_LOCK:
+        _CHAT_CACHE.clear()
+        _PAGE_CACHE.clear()
 
 @mcp.tool()
-def search_contacts(query: str) -> List[Dict[str, Any]]:
+async def search_contacts(query: str) -> List[Dict[str, Any]]:
     """Search WhatsApp contacts by name or phone number.
     
     Args:
         query: Search term to match against contact names or phone numbers
     """
-    contacts = whatsapp_search_contacts(query)
+    contacts = await _singleflight(
+        ('search_contacts', query), partial(_in_thread, _cached_search_contacts, query)
+    )
     return contacts
 
 @mcp.tool()
-def list_messages(
+async def list_messages(
     after: Optional[str] = None,
     before: Optional[str] = None,
     sender_phone_number: Optional[str] = None,
@@ -62,22 +275,25 @@ def list_messages(
         context_before: Number of messages to include before each match (default 1)
         context_after: Number of messages to include after each match (default 1)
     """
-    messages = whatsapp_list_messages(
-        after=after,
-        before=before,
-        sender_phone_number=sender_phone_number,
-        chat_jid=chat_jid,
-        query=query,
-        limit=limit,
-        page=page,
-        include_context=include_context,
-        context_before=context_before,
-        context_after=context_after
+    args = (
+        after, before, sender_phone_number, chat_jid, query,
+        limit, page, include_context, context_before, context_after
     )
+    with _CACHE_LOCK:
+        messages = _PAGE_CACHE.pop(args, None)
+    if messages is None:
+        messages = await _singleflight(
+            ('list_messages',) + args, partial(_in_thread, whatsapp_list_messages, *args)
+        )
+    # A full page suggests there is another one; agents usually read it next. With
+    # context the result also holds surrounding messages, so its length says nothing
+    # about how many matched and no prefetch is attempted
+    if not include_context and len(messages) >= limit:
+        _prefetch(_prefetch_message_page, *args[:6], page + 1, *args[7:])
     return messages
 
 @mcp.tool()
-def list_chats(
+async def list_chats(
     query: Optional[str] = None,
     limit: int = 20,
     page: int = 0,
@@ -93,38 +309,35 @@ def list_chats(
         include_last_message: Whether to include the last message in each chat (default True)
         sort_by: Field to sort results by, either "last_active" or "name" (default "last_active")
     """
-    chats = whatsapp_list_chats(
-        query=query,
-        limit=limit,
-        page=page,
-        include_last_message=include_last_message,
-        sort_by=sort_by
-    )
+    args = (query, limit, page, include_last_message, sort_by)
+    chats = await _singleflight(('list_chats',) + args, partial(_in_thread, _cached_list_chats, *args))
+    if len(chats) >= limit:
+        _prefetch(_cached_list_chats, query, limit, page + 1, include_last_message, sort_by)
     return chats
 
 @mcp.tool()
-def get_chat(chat_jid: str, include_last_message: bool = True) -> Dict[str, Any]:
+async def get_chat(chat_jid: str, include_last_message: bool = True) -> Optional[Dict[str, Any]]:
     """Get WhatsApp chat metadata by JID.
     
     Args:
         chat_jid: The JID of the chat to retrieve
         include_last_message: Whether to include the last message (default True)
     """
-    chat = whatsapp_get_chat(chat_jid, include_last_message)
+    chat = await _in_thread(_cached_get_chat, chat_jid, include_last_message)
     return dataclass_to_dict(chat)
 
 @mcp.tool()
-def get_direct_chat_by_contact(sender_phone_number: str) -> Dict[str, Any]:
+async def get_direct_chat_by_contact(sender_phone_number: str) -> Optional[Dict[str, Any]]:
     """Get WhatsApp chat metadata by sender phone number.
     
     Args:
         sender_phone_number: The phone number to search for
     """
-    chat = whatsapp_get_direct_chat_by_contact(sender_phone_number)
+    chat = await _in_thread(_cached_get_direct_chat_by_contact, sender_phone_number)
     return dataclass_to_dict(chat)
 
 @mcp.tool()
-def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Dict[str, Any]]:
+async def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Dict[str, Any]]:
     """Get all WhatsApp chats involving the contact.
     
     Args:
@@ -132,21 +345,20 @@ def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Dict[str
         limit: Maximum number of chats to return (default 20)
         page: Page number for pagination (default 0)
     """
-    chats = whatsapp_get_contact_chats(jid, limit, page)
+    chats = await _in_thread(_cached_get_contact_chats, jid, limit, page)
     return chats
 
 @mcp.tool()
-def get_last_interaction(jid: str) -> str:
+async def get_last_interaction(jid: Annotated[str, Field(min_length=1)]) -> Optional[str]:
     """Get most recent WhatsApp message involving the contact.
     
     Args:
         jid: The JID of the contact to search for
     """
-    message = whatsapp_get_last_interaction(jid)
-    return message
+    return await _in_thread(whatsapp_get_last_interaction, jid)
 
 @mcp.tool()
-def get_message_context(
+async def get_message_context(
     message_id: str,
     before: int = 5,
     after: int = 5
@@ -158,19 +370,18 @@ def get_message_context(
         before: Number of messages to include before the target message (default 5)
         after: Number of messages to include after the target message (default 5)
     """
-    context = whatsapp_get_message_context(message_id, before, after)
-    # Convert MessageContext to dict, including nested Message objects
-    result = dataclass_to_dict(context)
-    if result and 'message' in result:
-        result['message'] = dataclass_to_dict(context.message)
-    if result and 'before' in result:
-        result['before'] = [dataclass_to_dict(msg) for msg in context.before]
-    if result and 'after' in result:
-        result['after'] = [dataclass_to_dict(msg) for msg in context.after]
-    return result
+    context = await _in_thread(whatsapp_get_message_context, message_id, before, after)
+    if context is None:
+        return {}
+    # Convert each nested Message once instead of walking the whole context twice
+    return {
+        "message": _fast_msg_dict(context.message),
+        "before": [_fast_msg_dict(msg) for msg in context.before],
+        "after": [_fast_msg_dict(msg) for msg in context.after]
+    }
 
 @mcp.tool()
-def send_message(
+async def send_message(
     recipient: str,
     message: str
 ) -> Dict[str, Any]:
@@ -184,22 +395,26 @@ def send_message(
     Returns:
         A dictionary containing success status and a status message
     """
-    # Validate input
-    if not recipient:
+    # Validate input before touching the bridge
+    if not recipient or not _RECIPIENT_RE.fullmatch(recipient):
         return {
             "success": False,
-            "message": "Recipient must be provided"
+            "message": "Invalid recipient"
         }
     
     # Call the whatsapp_send_message function with the unified recipient parameter
-    success, status_message = whatsapp_send_message(recipient, message)
+    success, status_message = await _in_thread(
+        whatsapp_send_message, recipient, message, executor=_SEND_EXEC
+    )
+    if success:
+        _invalidate_chat_cache()
     return {
         "success": success,
         "message": status_message
     }
 
 @mcp.tool()
-def send_file(recipient: str, media_path: str) -> Dict[str, Any]:
+async def send_file(recipient: str, media_path: str) -> Dict[str, Any]:
     """Send a file such as a picture, raw audio, video or document via WhatsApp to the specified recipient. For group messages use the JID.
     
     Args:
@@ -210,16 +425,26 @@ def send_file(recipient: str, media_path: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing success status and a status message
     """
+
+    if not recipient or not _RECIPIENT_RE.fullmatch(recipient):
+        return {
+            "success": False,
+            "message": "Invalid recipient"
+        }
     
     # Call the whatsapp_send_file function
-    success, status_message = whatsapp_send_file(recipient, media_path)
+    success, status_message = await _in_thread(
+        whatsapp_send_file, recipient, media_path, executor=_SEND_EXEC
+    )
+    if success:
+        _invalidate_chat_cache()
     return {
         "success": success,
         "message": status_message
     }
 
 @mcp.tool()
-def send_audio_message(recipient: str, media_path: str) -> Dict[str, Any]:
+async def send_audio_message(recipient: str, media_path: str) -> Dict[str, Any]:
     """Send any audio file as a WhatsApp audio message to the specified recipient. For group messages use the JID. If it errors due to ffmpeg not being installed, use send_file instead.
     
     Args:
@@ -230,14 +455,24 @@ def send_audio_message(recipient: str, media_path: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing success status and a status message
     """
-    success, status_message = whatsapp_audio_voice_message(recipient, media_path)
+    if not recipient or not _RECIPIENT_RE.fullmatch(recipient):
+        return {
+            "success": False,
+            "message": "Invalid recipient"
+        }
+    
+    success, status_message = await _in_thread(
+        whatsapp_audio_voice_message, recipient, media_path, executor=_SEND_EXEC
+    )
+    if success:
+        _invalidate_chat_cache()
     return {
         "success": success,
         "message": status_message
     }
 
 @mcp.tool()
-def download_media(message_id: str, chat_jid: str) -> Dict[str, Any]:
+async def download_media(message_id: str, chat_jid: str) -> Dict[str, Any]:
     """Download media from a WhatsApp message and get the local file path.
     
     Args:
@@ -247,7 +482,7 @@ def download_media(message_id: str, chat_jid: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing success status, a status message, and the file path if successful
     """
-    file_path = whatsapp_download_media(message_id, chat_jid)
+    file_path = await _in_thread(whatsapp_download_media, message_id, chat_jid)
     
     if file_path:
         return {
@@ -262,7 +497,7 @@ def download_media(message_id: str, chat_jid: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
-def schedule_message(
+async def schedule_message(
     recipient: str,
     message: str,
     scheduled_time: str,
@@ -294,28 +529,20 @@ def schedule_message(
             check_for_response=True
         )
     """
-    try:
-        response = requests.post(
-            f"{BRIDGE_BASE_URL}/api/schedule",
-            json={
-                "recipient": recipient,
-                "message": message,
-                "scheduled_time": scheduled_time,
-                "check_for_response": check_for_response
-            },
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "success": False,
-            "message": f"Failed to schedule message: {str(e)}"
+    return await _bridge_call(
+        "POST",
+        "/api/schedule",
+        "Failed to schedule message",
+        json={
+            "recipient": recipient,
+            "message": message,
+            "scheduled_time": scheduled_time,
+            "check_for_response": check_for_response
         }
+    )
 
 @mcp.tool()
-def list_scheduled_messages(
+async def list_scheduled_messages(
     status: Optional[str] = None,
     recipient: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -335,30 +562,21 @@ def list_scheduled_messages(
         # Get all messages for a specific contact
         list_scheduled_messages(recipient="5491156543944")
     """
-    try:
-        params = {}
-        if status:
-            params["status"] = status
-        if recipient:
-            params["recipient"] = recipient
-        
-        response = requests.get(
-            f"{BRIDGE_BASE_URL}/api/scheduled",
-            params=params,
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "success": False,
-            "message": f"Failed to list scheduled messages: {str(e)}",
-            "messages": []
-        }
+    return await _singleflight(
+        ('list_scheduled_messages', status, recipient),
+        partial(_list_scheduled, status, recipient)
+    )
+
+async def _list_scheduled(status: Optional[str], recipient: Optional[str]) -> Dict[str, Any]:
+    params = {k: v for k, v in (("status", status), ("recipient", recipient)) if v}
+    result = await _bridge_call(
+        "GET", "/api/scheduled", "Failed to list scheduled messages", params=params
+    )
+    result.setdefault("messages", [])
+    return result
 
 @mcp.tool()
-def get_scheduled_message(message_id: str) -> Dict[str, Any]:
+async def get_scheduled_message(message_id: str) -> Dict[str, Any]:
     """Get details of a specific scheduled message.
     
     Args:
@@ -367,22 +585,13 @@ def get_scheduled_message(message_id: str) -> Dict[str, Any]:
     Returns:
         A dictionary with the scheduled message details
     """
-    try:
-        response = requests.get(
-            f"{BRIDGE_BASE_URL}/api/scheduled/{message_id}",
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "success": False,
-            "message": f"Failed to get scheduled message: {str(e)}"
-        }
+    return await _singleflight(
+        ('get_scheduled_message', message_id),
+        partial(_bridge_call, "GET", _SCHEDULED_PATH + message_id, "Failed to get scheduled message")
+    )
 
 @mcp.tool()
-def cancel_scheduled_message(message_id: str) -> Dict[str, Any]:
+async def cancel_scheduled_message(message_id: str) -> Dict[str, Any]:
     """Cancel a scheduled message before it's sent.
     
     This permanently cancels the message. It cannot be resumed after cancellation.
@@ -396,22 +605,12 @@ def cancel_scheduled_message(message_id: str) -> Dict[str, Any]:
     Example:
         cancel_scheduled_message("abc-123-def-456")
     """
-    try:
-        response = requests.delete(
-            f"{BRIDGE_BASE_URL}/api/scheduled/{message_id}",
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "success": False,
-            "message": f"Failed to cancel message: {str(e)}"
-        }
+    return await _bridge_call(
+        "DELETE", _SCHEDULED_PATH + message_id, "Failed to cancel message"
+    )
 
 @mcp.tool()
-def pause_scheduled_message(message_id: str) -> Dict[str, Any]:
+async def pause_scheduled_message(message_id: str) -> Dict[str, Any]:
     """Pause a pending scheduled message.
     
     A paused message will not be sent at its scheduled time. It can be resumed later.
@@ -425,23 +624,16 @@ def pause_scheduled_message(message_id: str) -> Dict[str, Any]:
     Example:
         pause_scheduled_message("abc-123-def-456")
     """
-    try:
-        response = requests.patch(
-            f"{BRIDGE_BASE_URL}/api/scheduled/{message_id}",
-            json={"action": "pause"},
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "success": False,
-            "message": f"Failed to pause message: {str(e)}"
-        }
+    return await _bridge_call(
+        "PATCH",
+        _SCHEDULED_PATH + message_id,
+        "Failed to pause message",
+        content=_PAUSE_BODY,
+        headers=_JSON_HDR
+    )
 
 @mcp.tool()
-def resume_scheduled_message(message_id: str) -> Dict[str, Any]:
+async def resume_scheduled_message(message_id: str) -> Dict[str, Any]:
     """Resume a paused scheduled message.
     
     The message will be sent at its originally scheduled time if that time hasn't passed yet.
@@ -456,33 +648,111 @@ def resume_scheduled_message(message_id: str) -> Dict[str, Any]:
     Example:
         resume_scheduled_message("abc-123-def-456")
     """
-    try:
-        response = requests.patch(
-            f"{BRIDGE_BASE_URL}/api/scheduled/{message_id}",
-            json={"action": "resume"},
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
+    return await _bridge_call(
+        "PATCH",
+        _SCHEDULED_PATH + message_id,
+        "Failed to resume message",
+        content=_RESUME_BODY,
+        headers=_JSON_HDR
+    )
+
+# Upper bound on operations per batch_scheduled_ops call
+_MAX_BATCH_OPS = 20
+
+@mcp.tool()
+async def batch_scheduled_ops(
+    ops: Annotated[List[Dict[str, Any]], Field(min_length=1, max_length=_MAX_BATCH_OPS)]
+) -> Dict[str, Any]:
+    """Run several scheduled-message operations in a single call.
+    
+    Operations are sent to the bridge concurrently and their results are returned
+    in the same order as the input.
     
-    except requests.exceptions.RequestException as e:
+    Args:
+        ops: List of 1 to 20 operations. Each one has an "action" of "get", "cancel",
+             "pause", "resume" or "schedule". "schedule" takes "recipient", "message",
+             "scheduled_time" and optionally "check_for_response"; every other action
+             takes "message_id"
+    
+    Returns:
+        A dictionary with overall success status and one result per operation
+    
+    Example:
+        batch_scheduled_ops(ops=[
+            {"action": "pause", "message_id": "abc-123-def-456"},
+            {"action": "cancel", "message_id": "ghi-789-jkl-012"}
+        ])
+    """
+    results = await asyncio.gather(*(_run_scheduled_op(op) for op in ops))
+    return {
+        "success": all(result.get("success", False) for result in results),
+        "results": results
+    }
+
+_SCHEDULED_OPS = {
+    "get": get_scheduled_message,
+    "cancel": cancel_scheduled_message,
+    "pause": pause_scheduled_message,
+    "resume": resume_scheduled_message
+}
+
+# Fields a batch "schedule" op must give as strings; other actions need only message_id
+_SCHEDULE_FIELDS = ("recipient", "message", "scheduled_time")
+
+async def _run_scheduled_op(op: Dict[str, Any]) -> Dict[str, Any]:
+    action = op.get("action")
+    if action != "schedule" and not (isinstance(action, str) and action in _SCHEDULED_OPS):
         return {
             "success": False,
-            "message": f"Failed to resume message: {str(e)}"
+            "message": f"Unknown action: {action}"
         }
+    required = _SCHEDULE_FIELDS if action == "schedule" else ("message_id",)
+    for name in required:
+        if name not in op:
+            return {
+                "success": False,
+                "message": f"Missing field for '{action}': '{name}'"
+            }
+        if not isinstance(op[name], str):
+            return {
+                "success": False,
+                "message": f"Field '{name}' for '{action}' must be a string"
+            }
+    if action == "schedule":
+        check_for_response = op.get("check_for_response", True)
+        if not isinstance(check_for_response, bool):
+            return {
+                "success": False,
+                "message": "Field 'check_for_response' for 'schedule' must be a boolean"
+            }
+        return await schedule_message(
+            op["recipient"],
+            op["message"],
+            op["scheduled_time"],
+            check_for_response
+        )
+    return await _SCHEDULED_OPS[action](op["message_id"])
+
+# Optionally advertise only each tool's summary paragraph to keep tools/list small
+if CFG.strip_docs:
+    for tool in mcp._tool_manager.list_tools():
+        tool.description = inspect.cleandoc(tool.description).split("\n\n", 1)[0]
+
+async def _serve(transport: str) -> None:
+    """Run the MCP server and close the bridge client on shutdown."""
+    try:
+        if transport == 'streamable-http':
+            await mcp.run_streamable_http_async()
+        else:
+            await mcp.run_stdio_async()
+    finally:
+        await _HTTP.aclose()
 
 if __name__ == "__main__":
     import sys
-    import asyncio
-    from starlette.applications import Starlette
-    from starlette.routing import Route
-    from starlette.responses import Response, JSONResponse, RedirectResponse
-    from starlette.requests import Request
-    import uvicorn
-    import json
     
     # Check if running in HTTP mode or stdio mode
-    mode = os.environ.get('MCP_TRANSPORT', 'stdio').lower()
+    mode = CFG.transport
     
     # Allow command line override
     if len(sys.argv) > 1:
@@ -492,166 +762,24 @@ if __name__ == "__main__":
             mode = 'stdio'
     
     if mode == 'http':
-        # HTTP Streamable mode with OAuth 2.1
-        print("🌐 Starting MCP Server with OAuth 2.1 in HTTP Streamable mode...")
-        print(f"📡 Bridge URL: {BRIDGE_BASE_URL}")
-        print(f"🔐 OAuth Client ID: {OAUTH_CLIENT_ID}")
-        print(f"🔑 OAuth Client Secret: {OAUTH_CLIENT_SECRET[:8]}...{OAUTH_CLIENT_SECRET[-4:]}")
-        
-        # Create FastAPI app for OAuth endpoints
-        app = FastAPI(title="WhatsApp MCP Server with OAuth 2.1")
-        
-        # Add CORS middleware
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
-        
-        # OAuth 2.1 Discovery Endpoint
-        @app.get("/.well-known/oauth-authorization-server")
-        async def oauth_metadata():
-            """OAuth 2.1 Authorization Server Metadata"""
-            return {
-                "issuer": SERVER_URL,
-                "authorization_endpoint": f"{SERVER_URL}/oauth/authorize",
-                "token_endpoint": f"{SERVER_URL}/oauth/token",
-                "response_types_supported": ["code"],
-                "grant_types_supported": ["authorization_code"],
-                "code_challenge_methods_supported": ["S256"],
-                "token_endpoint_auth_methods_supported": ["client_secret_post"],
-            }
-        
-        # OAuth Authorization Endpoint
-        @app.get("/oauth/authorize")
-        async def authorize(
-            response_type: str,
-            client_id: str,
-            redirect_uri: str,
-            state: str,
-            code_challenge: str,
-            code_challenge_method: str
-        ):
-            """OAuth 2.1 Authorization Endpoint with PKCE"""
-            # Validate client_id
-            if client_id != OAUTH_CLIENT_ID:
-                raise HTTPException(status_code=400, detail="Invalid client_id")
-            
-            # Validate response_type
-            if response_type != "code":
-                raise HTTPException(status_code=400, detail="Unsupported response_type")
-            
-            # Validate PKCE
-            if code_challenge_method != "S256":
-                raise HTTPException(status_code=400, detail="Only S256 code_challenge_method is supported")
-            
-            # Generate authorization code
-            auth_code = secrets.token_urlsafe(32)
-            
-            # Store authorization code with PKCE challenge
-            oauth_codes[auth_code] = {
-                "client_id": client_id,
-                "redirect_uri": redirect_uri,
-                "code_challenge": code_challenge,
-                "expires_at": datetime.now() + timedelta(minutes=10)
-            }
-            
-            # Redirect back to client with code
-            return RedirectResponse(
-                url=f"{redirect_uri}?code={auth_code}&state={state}",
-                status_code=302
-            )
-        
-        # OAuth Token Endpoint
-        @app.post("/oauth/token")
-        async def token(
-            grant_type: str = Form(...),
-            code: str = Form(...),
-            redirect_uri: str = Form(...),
-            client_id: str = Form(...),
-            client_secret: str = Form(...),
-            code_verifier: str = Form(...)
-        ):
-            """OAuth 2.1 Token Endpoint with PKCE"""
-            # Validate grant_type
-            if grant_type != "authorization_code":
-                raise HTTPException(status_code=400, detail="Unsupported grant_type")
-            
-            # Validate client credentials
-            if client_id != OAUTH_CLIENT_ID or client_secret != OAUTH_CLIENT_SECRET:
-                raise HTTPException(status_code=401, detail="Invalid client credentials")
-            
-            # Validate authorization code
-            if code not in oauth_codes:
-                raise HTTPException(status_code=400, detail="Invalid authorization code")
-            
-            code_data = oauth_codes[code]
-            
-            # Check expiration
-            if datetime.now() > code_data["expires_at"]:
-                del oauth_codes[code]
-                raise HTTPException(status_code=400, detail="Authorization code expired")
-            
-            # Validate redirect_uri matches
-            if redirect_uri != code_data["redirect_uri"]:
-                raise HTTPException(status_code=400, detail="Redirect URI mismatch")
-            
-            # Validate PKCE code_verifier
-            verifier_hash = base64.urlsafe_b64encode(
-                hashlib.sha256(code_verifier.encode()).digest()
-            ).decode().rstrip('=')
-            
-            if verifier_hash != code_data["code_challenge"]:
-                raise HTTPException(status_code=400, detail="Invalid code_verifier")
-            
-            # Delete used authorization code
-            del oauth_codes[code]
-            
-            # Generate access token
-            access_token = secrets.token_urlsafe(32)
-            
-            # Store access token
-            oauth_tokens[access_token] = {
-                "client_id": client_id,
-                "expires_at": datetime.now() + timedelta(hours=24)
-            }
-            
-            return {
-                "access_token": access_token,
-                "token_type": "Bearer",
-                "expires_in": 86400  # 24 hours
-            }
-        
-        # Mount FastMCP's HTTP Streamable endpoint
-        # We need to get the ASGI app from FastMCP
-        port = int(os.environ.get('MCP_PORT', '8300'))
-        host = os.environ.get('MCP_HOST', '0.0.0.0')
-        
-        # Configure FastMCP settings for HTTP mode
-        mcp.settings.host = host
-        mcp.settings.port = port
-        mcp.settings.streamable_http_path = "/messages"
-        
-        # Get FastMCP's ASGI app and mount it
-        from mcp.server.fastmcp.server import create_app_streamable
-        mcp_app = create_app_streamable(mcp)
+        # Use libuv's event loop for the HTTP server where available
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
         
-        # Mount MCP app under /messages
-        app.mount("/messages", mcp_app)
+        # HTTP Streamable mode; OAuth is handled by oauth_proxy.py in front of this server
+        print("🌐 Starting MCP Server in HTTP Streamable mode...")
+        print(f"📡 Bridge URL: {CFG.bridge_url}")
         
-        print(f"✅ Server ready to start on http://{host}:{port}")
-        print(f"📍 MCP endpoint: http://{host}:{port}/messages")
-        print(f"� OAuth discovery: http://{host}:{port}/.well-known/oauth-authorization-server")
-        print(f"� OAuth authorize: http://{host}:{port}/oauth/authorize")
-        print(f"🎫 OAuth token: http://{host}:{port}/oauth/token")
+        print(f"✅ Server ready to start on http://{CFG.host}:{CFG.port}")
+        print(f"📍 MCP endpoint: http://{CFG.host}:{CFG.port}{CFG.streamable_path}")
         
-        # Run with uvicorn
-        uvicorn.run(app, host=host, port=port)
+        asyncio.run(_serve('streamable-http'))
     
     else:
         # stdio mode for local access
         print("💻 Starting MCP Server in stdio mode...")
-        print(f"📡 Bridge URL: {BRIDGE_BASE_URL}")
-        mcp.run(transport='stdio')
+        print(f"📡 Bridge URL: {CFG.bridge_url}")
+        asyncio.run(_serve('stdio'))
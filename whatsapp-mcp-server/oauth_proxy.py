@@ -5,17 +5,29 @@ This proxy handles OAuth 2.1 authentication and forwards authenticated requests
 to the FastMCP server running on port 8300.
 """
 
-from fastapi import FastAPI, Request, HTTPException, Form, Header
-from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse, Response
+from fastapi import FastAPI, Request, HTTPException, Form, Header, Depends
+from fastapi.responses import RedirectResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 import httpx
+import orjson
 import secrets
 import hashlib
+import hmac
 import base64
-from datetime import datetime, timedelta
+import binascii
+from datetime import datetime
 from typing import Optional
+from contextlib import asynccontextmanager
+import logging
 import os
+import re
 import uvicorn
+import time
+from cachetools import LRUCache, TTLCache
+
+logger = logging.getLogger("oauth_proxy")
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
 
 # Configuration
 SERVER_URL = os.environ.get('SERVER_URL', 'https://rzdevquality.com:8443')
@@ -34,12 +46,82 @@ ALLOWED_REDIRECT_URI_DOMAINS = [
     "https://api.anthropic.com"
 ]
 
-# In-memory storage (use Redis/DB in production)
-oauth_codes = {}
-oauth_tokens = {}
-registered_clients = {}  # client_id -> {client_secret, client_name, redirect_uris, created_at}
+# RFC 7636 code_verifier: 43-128 unreserved characters
+CODE_VERIFIER_RE = re.compile(r"[A-Za-z0-9\-._~]{43,128}")
+
+# "Bearer <token>"; the scheme is case-insensitive (RFC 7235) and extra spaces are tolerated
+BEARER_RE = re.compile(r"Bearer +(\S+)", re.IGNORECASE)
+
+# Token lifetimes in seconds
+AUTH_CODE_TTL = 600
+ACCESS_TOKEN_TTL = 86400
+
+# In-memory storage (use Redis/DB in production); codes and tokens expire on their own
+oauth_codes = TTLCache(maxsize=100_000, ttl=AUTH_CODE_TTL)
+oauth_tokens = TTLCache(maxsize=1_000_000, ttl=ACCESS_TOKEN_TTL)  # keyed by token_key()
+registered_clients = LRUCache(maxsize=10_000)  # client_id -> {client_secret_hash, client_name, redirect_uris, created_at}
+
+# Token bucket per client IP for /oauth/register: bursts of REGISTER_BURST, refilled at REGISTER_RATE/s.
+# Behind a reverse proxy the client IP comes from X-Forwarded-For, which uvicorn only
+# trusts from FORWARDED_ALLOW_IPS; otherwise every caller shares the proxy's bucket.
+# Keep it to the proxy's own address or subnet: "*" lets any caller pick its own IP
+REGISTER_BURST = 5
+REGISTER_RATE = 5 / 60
+register_buckets = TTLCache(maxsize=10_000, ttl=3600)  # ip -> (tokens, last_refill)
+
+def allow_registration(ip: str) -> bool:
+    """Take one token from the caller's bucket; False when it is empty."""
+    now = time.monotonic()
+    tokens, last = register_buckets.get(ip, (REGISTER_BURST, now))
+    tokens = min(REGISTER_BURST, tokens + (now - last) * REGISTER_RATE)
+    allowed = tokens >= 1
+    register_buckets[ip] = (tokens - 1 if allowed else tokens, now)
+    return allowed
+
+# Discovery metadata never changes at runtime, so encode it once
+OAUTH_METADATA = orjson.dumps({
+    "issuer": SERVER_URL,
+    "authorization_endpoint": f"{SERVER_URL}/oauth/authorize",
+    "token_endpoint": f"{SERVER_URL}/oauth/token",
+    "registration_endpoint": f"{SERVER_URL}/oauth/register",
+    "response_types_supported": ["code"],
+    "grant_types_supported": ["authorization_code"],
+    "code_challenge_methods_supported": ["S256"],
+    "token_endpoint_auth_methods_supported": ["client_secret_post"],
+})
+OAUTH_METADATA_HEADERS = {
+    "ETag": '"' + hashlib.blake2b(OAUTH_METADATA, digest_size=8).hexdigest() + '"',
+    "Cache-Control": "public, max-age=86400"
+}
+
+def secret_hash(secret: str) -> bytes:
+    """Digest of a client secret; only digests are kept and compared."""
+    return hashlib.blake2b(secret.encode(), digest_size=32).digest()
+
+OAUTH_CLIENT_SECRET_HASH = secret_hash(OAUTH_CLIENT_SECRET)
+
+def token_key(access_token: str) -> bytes:
+    """Fixed-size digest used to store access tokens instead of the raw token."""
+    return hashlib.blake2b(access_token.encode(), digest_size=16).digest()
 
-app = FastAPI(title="WhatsApp MCP OAuth Proxy")
+# Shared client so proxied requests reuse keep-alive connections to the backend
+mcp_client = httpx.AsyncClient(
+    base_url=MCP_BACKEND,
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the backend client when the proxy shuts down."""
+    yield
+    await mcp_client.aclose()
+
+app = FastAPI(
+    title="WhatsApp MCP OAuth Proxy",
+    lifespan=lifespan
+)
 
 # CORS
 app.add_middleware(
@@ -52,18 +134,11 @@ app.add_middleware(
 
 # OAuth 2.1 Discovery Endpoint
 @app.get("/.well-known/oauth-authorization-server")
-async def oauth_metadata():
+async def oauth_metadata(request: Request):
     """OAuth 2.1 Authorization Server Metadata with Dynamic Client Registration"""
-    return {
-        "issuer": SERVER_URL,
-        "authorization_endpoint": f"{SERVER_URL}/oauth/authorize",
-        "token_endpoint": f"{SERVER_URL}/oauth/token",
-        "registration_endpoint": f"{SERVER_URL}/oauth/register",
-        "response_types_supported": ["code"],
-        "grant_types_supported": ["authorization_code"],
-        "code_challenge_methods_supported": ["S256"],
-        "token_endpoint_auth_methods_supported": ["client_secret_post"],
-    }
+    if request.headers.get("if-none-match") == OAUTH_METADATA_HEADERS["ETag"]:
+        return Response(status_code=304, headers=OAUTH_METADATA_HEADERS)
+    return Response(content=OAUTH_METADATA, media_type="application/json", headers=OAUTH_METADATA_HEADERS)
 
 # Dynamic Client Registration Endpoint (RFC 7591)
 @app.post("/oauth/register")
@@ -75,8 +150,13 @@ async def register_client(request: Request):
     
     SECURITY: Only whitelisted domains (Claude.ai/Anthropic) can register.
     """
+    client_ip = request.client.host if request.client else "unknown"
+    if not allow_registration(client_ip):
+        logger.warning("🚫 Rate-limited client registration from %s", client_ip)
+        raise HTTPException(status_code=429, detail="Too many registrations")
+    
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
         
         # Validate required fields
         redirect_uris = body.get("redirect_uris", [])
@@ -91,36 +171,39 @@ async def register_client(request: Request):
                     allowed = True
                     break
             if not allowed:
-                print(f"🚫 Rejected registration attempt with unauthorized redirect URI: {uri}")
+                logger.warning("🚫 Rejected registration attempt with unauthorized redirect URI: %s", uri)
                 raise HTTPException(
                     status_code=403, 
                     detail=f"Registration not allowed. Redirect URI must be from Claude.ai or Anthropic domains."
                 )
         
+        now = datetime.now()
+        
         # Generate client credentials
         client_id = f"mcp-{secrets.token_urlsafe(16)}"
         client_secret = secrets.token_urlsafe(32)
         
         # Store client registration
         registered_clients[client_id] = {
-            "client_secret": client_secret,
+            "client_secret_hash": secret_hash(client_secret),
             "client_name": body.get("client_name", "MCP Client"),
             "redirect_uris": redirect_uris,
             "grant_types": body.get("grant_types", ["authorization_code"]),
             "response_types": body.get("response_types", ["code"]),
             "token_endpoint_auth_method": body.get("token_endpoint_auth_method", "client_secret_post"),
-            "created_at": datetime.now().isoformat()
+            "created_at": now.isoformat()
         }
         
-        print(f"✅ Registered new OAuth client: {client_id}")
-        print(f"   Client Name: {body.get('client_name', 'MCP Client')}")
-        print(f"   Redirect URIs: {redirect_uris}")
+        logger.info(
+            "✅ Registered new OAuth client: %s (name: %s, redirect URIs: %s)",
+            client_id, body.get("client_name", "MCP Client"), redirect_uris
+        )
         
         # Return client credentials (RFC 7591 response)
         return {
             "client_id": client_id,
             "client_secret": client_secret,
-            "client_id_issued_at": int(datetime.now().timestamp()),
+            "client_id_issued_at": int(now.timestamp()),
             "client_secret_expires_at": 0,  # Never expires
             "redirect_uris": redirect_uris,
             "grant_types": ["authorization_code"],
@@ -129,7 +212,7 @@ async def register_client(request: Request):
         }
         
     except Exception as e:
-        print(f"❌ Error registering client: {e}")
+        logger.error("❌ Error registering client: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 # OAuth Authorization Endpoint
@@ -159,6 +242,12 @@ async def authorize(
     if code_challenge_method != "S256":
         raise HTTPException(status_code=400, detail="Only S256 code_challenge_method is supported")
     
+    # Keep the raw SHA-256 digest so the token endpoint can compare bytes directly
+    try:
+        code_challenge_raw = base64.urlsafe_b64decode(code_challenge + "=" * (-len(code_challenge) % 4))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid code_challenge")
+    
     # Generate authorization code
     auth_code = secrets.token_urlsafe(32)
     
@@ -166,11 +255,10 @@ async def authorize(
     oauth_codes[auth_code] = {
         "client_id": client_id,
         "redirect_uri": redirect_uri,
-        "code_challenge": code_challenge,
-        "expires_at": datetime.now() + timedelta(minutes=10)
+        "code_challenge_raw": code_challenge_raw
     }
     
-    print(f"✅ Generated auth code for client {client_id}")
+    logger.info("✅ Generated auth code for client %s", client_id)
     
     # Redirect back with code
     return RedirectResponse(
@@ -193,133 +281,108 @@ async def token(
         raise HTTPException(status_code=400, detail="Unsupported grant_type")
     
     # Validate client credentials - support both hardcoded and dynamic clients
+    # Secrets are compared as fixed-size digests in constant time
     valid_credentials = False
-    if client_id == OAUTH_CLIENT_ID and client_secret == OAUTH_CLIENT_SECRET:
-        valid_credentials = True
+    if client_id == OAUTH_CLIENT_ID:
+        valid_credentials = hmac.compare_digest(secret_hash(client_secret), OAUTH_CLIENT_SECRET_HASH)
     elif client_id in registered_clients:
-        if registered_clients[client_id]["client_secret"] == client_secret:
-            valid_credentials = True
+        valid_credentials = hmac.compare_digest(
+            secret_hash(client_secret), registered_clients[client_id]["client_secret_hash"]
+        )
     
     if not valid_credentials:
         raise HTTPException(status_code=401, detail="Invalid client credentials")
     
-    if code not in oauth_codes:
-        raise HTTPException(status_code=400, detail="Invalid authorization code")
-    
-    code_data = oauth_codes[code]
+    # Codes are single-use: take it out before any checks so it can't be replayed
+    code_data = oauth_codes.pop(code, None)
+    if code_data is None:
+        raise HTTPException(status_code=400, detail="Invalid or expired authorization code")
     
-    if datetime.now() > code_data["expires_at"]:
-        del oauth_codes[code]
-        raise HTTPException(status_code=400, detail="Authorization code expired")
+    if client_id != code_data["client_id"]:
+        raise HTTPException(status_code=400, detail="Authorization code was issued to another client")
     
     if redirect_uri != code_data["redirect_uri"]:
         raise HTTPException(status_code=400, detail="Redirect URI mismatch")
     
-    # Validate PKCE
-    verifier_hash = base64.urlsafe_b64encode(
-        hashlib.sha256(code_verifier.encode()).digest()
-    ).decode().rstrip('=')
-    
-    if verifier_hash != code_data["code_challenge"]:
+    # Validate PKCE (constant-time compare on the raw digests)
+    if not CODE_VERIFIER_RE.fullmatch(code_verifier):
         raise HTTPException(status_code=400, detail="Invalid code_verifier")
     
-    # Delete used code
-    del oauth_codes[code]
+    verifier_digest = hashlib.sha256(code_verifier.encode("ascii")).digest()
+    
+    if not hmac.compare_digest(verifier_digest, code_data["code_challenge_raw"]):
+        raise HTTPException(status_code=400, detail="Invalid code_verifier")
     
     # Generate access token
     access_token = secrets.token_urlsafe(32)
     
-    oauth_tokens[access_token] = {
-        "client_id": client_id,
-        "expires_at": datetime.now() + timedelta(hours=24)
+    oauth_tokens[token_key(access_token)] = {
+        "client_id": client_id
     }
     
-    print(f"✅ Issued access token for client {client_id}")
+    logger.info("✅ Issued access token for client %s", client_id)
     
     return {
         "access_token": access_token,
         "token_type": "Bearer",
-        "expires_in": 86400
+        "expires_in": ACCESS_TOKEN_TTL
     }
 
-# Middleware to validate access token
+# Dependency that validates the access token
 async def validate_token(authorization: Optional[str] = Header(None)):
     """Validate Bearer token from Authorization header"""
     if not authorization:
-        return None
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization")
     
-    if not authorization.startswith("Bearer "):
+    match = BEARER_RE.fullmatch(authorization)
+    if not match:
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     
-    token = authorization.replace("Bearer ", "")
-    
-    if token not in oauth_tokens:
+    token_data = oauth_tokens.get(token_key(match.group(1)))
+    if token_data is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    token_data = oauth_tokens[token]
-    
-    if datetime.now() > token_data["expires_at"]:
-        del oauth_tokens[token]
-        raise HTTPException(status_code=401, detail="Token expired")
-    
     return token_data
 
+# Hop-by-hop and length headers describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset({
+    "host", "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length"
+})
+
+def forward_headers(headers) -> dict:
+    """Copy headers for the next hop, dropping ones that only apply to this connection."""
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
 # Proxy MCP requests to backend
 @app.api_route("/messages", methods=["GET", "POST", "OPTIONS"])
-async def proxy_mcp(request: Request, authorization: Optional[str] = Header(None)):
+async def proxy_mcp(request: Request, token_data: dict = Depends(validate_token)):
     """Proxy authenticated requests to MCP backend"""
+    if request.method == "OPTIONS":
+        return Response(status_code=200)
     
-    # Validate OAuth token
-    token_data = await validate_token(authorization)
-    if not token_data:
-        raise HTTPException(status_code=401, detail="Missing or invalid authorization")
-    
-    # Proxy request to MCP backend
-    async with httpx.AsyncClient() as client:
-        try:
-            if request.method == "GET":
-                response = await client.get(
-                    f"{MCP_BACKEND}/messages",
-                    headers=dict(request.headers),
-                    timeout=30.0
-                )
-                
-                if "text/event-stream" in response.headers.get("content-type", ""):
-                    return StreamingResponse(
-                        response.aiter_bytes(),
-                        media_type="text/event-stream",
-                        headers=dict(response.headers)
-                    )
-                else:
-                    return Response(
-                        content=response.content,
-                        status_code=response.status_code,
-                        headers=dict(response.headers)
-                    )
-            
-            elif request.method == "POST":
-                body = await request.body()
-                response = await client.post(
-                    f"{MCP_BACKEND}/messages",
-                    content=body,
-                    headers=dict(request.headers),
-                    timeout=30.0
-                )
-                
-                return Response(
-                    content=response.content,
-                    status_code=response.status_code,
-                    headers=dict(response.headers)
-                )
-            
-            elif request.method == "OPTIONS":
-                return Response(status_code=200)
-                
-        except httpx.RequestError as e:
-            print(f"❌ Error proxying to MCP backend: {e}")
-            raise HTTPException(status_code=502, detail="Backend unavailable")
+    # Proxy request to MCP backend, streaming bodies both ways (covers SSE replies too)
+    try:
+        backend_request = mcp_client.build_request(
+            request.method,
+            "/messages",
+            content=request.stream() if request.method == "POST" else None,
+            headers=forward_headers(request.headers)
+        )
+        response = await mcp_client.send(backend_request, stream=True)
+    except httpx.RequestError as e:
+        logger.error("❌ Error proxying to MCP backend: %s", e)
+        raise HTTPException(status_code=502, detail="Backend unavailable")
+    
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=forward_headers(response.headers),
+        background=BackgroundTask(response.aclose)
+    )
 
 if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s")
     port = int(os.environ.get('PROXY_PORT', '8300'))
     host = os.environ.get('PROXY_HOST', '0.0.0.0')
     
@@ -334,4 +397,13 @@ if __name__ == "__main__":
     print(f"   - OAuth Token: /oauth/token")
     print(f"   - MCP Messages: /messages")
     
-    uvicorn.run(app, host=host, port=port)
+    # uvicorn's "auto" loop/http already pick uvloop and httptools when installed;
+    # per-request access logging is opt-in since it writes to stderr synchronously
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        proxy_headers=True,
+        forwarded_allow_ips=os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1'),
+        access_log=os.environ.get('PROXY_ACCESS_LOG') == '1'
+    )
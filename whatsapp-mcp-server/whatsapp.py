@@ -5,6 +5,8 @@ from typing import Optional, List, Tuple
 import os
 import os.path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import audio
 
@@ -12,6 +14,17 @@ import audio
 BRIDGE_BASE_URL = os.environ.get('WHATSAPP_BRIDGE_URL', 'http://localhost:8080')
 WHATSAPP_API_BASE_URL = f"{BRIDGE_BASE_URL}/api"
 
+# Shared session so send/download calls reuse keep-alive connections to the bridge
+_bridge = requests.Session()
+_bridge.headers["Connection"] = "keep-alive"
+_bridge_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+)
+_bridge.mount('http://', _bridge_adapter)
+_bridge.mount('https://', _bridge_adapter)
+
 # Database path - use environment variable or default relative path
 MESSAGES_DB_PATH = os.environ.get(
     'MESSAGES_DB_PATH',
@@ -55,16 +68,27 @@ class MessageContext:
     before: List[Message]
     after: List[Message]
 
+def _iso_dict_factory(items):
+    """Build a dict from dataclass fields, converting datetimes to ISO format strings."""
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in items}
+
 def dataclass_to_dict(obj):
-    """Convert a dataclass to a dictionary with proper datetime serialization."""
+    """Convert a dataclass to a dictionary with proper datetime serialization.
+    
+    Nested dataclasses (e.g. the messages of a MessageContext) are converted in the
+    same pass, including their datetime fields.
+    """
     if obj is None:
         return None
-    result = asdict(obj)
-    # Convert datetime objects to ISO format strings
-    for key, value in result.items():
-        if isinstance(value, datetime):
-            result[key] = value.isoformat()
-    return result
+    return asdict(obj, dict_factory=_iso_dict_factory)
+
+def _iter_rows(cursor, size: int = 256):
+    """Yield rows from an executed cursor in batches instead of one fetchall()."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
 
 def get_sender_name(sender_jid: str) -> str:
     try:
@@ -204,11 +228,10 @@ def list_messages(
         params.extend([limit, offset])
         
         cursor.execute(" ".join(query_parts), tuple(params))
-        messages = cursor.fetchall()
         
         result = []
-        for msg in messages:
-            message = Message(
+        for msg in _iter_rows(cursor):
+            result.append(Message(
                 timestamp=datetime.fromisoformat(msg[0]),
                 sender=msg[1],
                 chat_name=msg[2],
@@ -217,33 +240,14 @@ def list_messages(
                 chat_jid=msg[5],
                 id=msg[6],
                 media_type=msg[7]
-            )
-            result.append(dataclass_to_dict(message))
+            ))
             
         if include_context and result:
-            # Add context for each message
-            messages_with_context = []
-            for msg_dict in result:
-                # Reconstruct Message object for get_message_context
-                msg_obj = Message(
-                    timestamp=datetime.fromisoformat(msg_dict['timestamp']),
-                    sender=msg_dict['sender'],
-                    chat_name=msg_dict['chat_name'],
-                    content=msg_dict['content'],
-                    is_from_me=msg_dict['is_from_me'],
-                    chat_jid=msg_dict['chat_jid'],
-                    id=msg_dict['id'],
-                    media_type=msg_dict['media_type']
-                )
-                context = get_message_context(msg_obj.id, context_before, context_after)
-                messages_with_context.extend([dataclass_to_dict(m) for m in context.before])
-                messages_with_context.append(dataclass_to_dict(context.message))
-                messages_with_context.extend([dataclass_to_dict(m) for m in context.after])
-            
-            return messages_with_context
+            # Fetch the context of every match in one windowed query
+            return _list_context_windows(cursor, result, context_before, context_after)
             
         # Return messages without context
-        return result    
+        return [dataclass_to_dict(message) for message in result]
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -253,6 +257,74 @@ def list_messages(
             conn.close()
 
 
+def _list_context_windows(
+    cursor: sqlite3.Cursor,
+    matches: List[Message],
+    before: int,
+    after: int
+) -> List[dict]:
+    """Get each match surrounded by its context messages using a single query.
+    
+    Messages are numbered per chat (by timestamp, then id) so every match's neighbours
+    are a simple row-number range, instead of separate before/after queries per match.
+    Like get_message_context, context only takes messages strictly older or newer than
+    the match, so other messages sharing its timestamp are left out. Results keep that
+    function's order: the messages before each match (closest first), the match itself,
+    then the messages after it.
+    """
+    targets = ", ".join("(?, ?, ?)" for _ in matches)
+    params = []
+    for pos, message in enumerate(matches):
+        params.extend([pos, message.id, message.chat_jid])
+    params.extend([before, after])
+    
+    cursor.execute(f"""
+        WITH targets(pos, id, chat_jid) AS (VALUES {targets}),
+        numbered AS (
+            SELECT messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, chats.jid, messages.id, messages.media_type,
+                ROW_NUMBER() OVER chat_order AS rn,
+                RANK() OVER by_time - 1 AS older,
+                COUNT(*) OVER by_time AS not_newer
+            FROM messages
+            JOIN chats ON messages.chat_jid = chats.jid
+            WHERE messages.chat_jid IN (SELECT chat_jid FROM targets)
+            WINDOW chat_order AS (PARTITION BY messages.chat_jid ORDER BY messages.timestamp, messages.id),
+                by_time AS (PARTITION BY messages.chat_jid ORDER BY messages.timestamp)
+        ),
+        anchors AS (
+            SELECT targets.pos, numbered.jid, numbered.rn, numbered.older, numbered.not_newer
+            FROM targets
+            JOIN numbered ON numbered.id = targets.id AND numbered.jid = targets.chat_jid
+        ),
+        windows AS (
+            SELECT anchors.pos, numbered.*,
+                CASE WHEN numbered.rn = anchors.rn THEN 1 WHEN numbered.rn <= anchors.older THEN 0 ELSE 2 END AS part
+            FROM anchors
+            JOIN numbered ON numbered.jid = anchors.jid
+                AND (numbered.rn = anchors.rn
+                    OR numbered.rn BETWEEN anchors.older - ? + 1 AND anchors.older
+                    OR numbered.rn BETWEEN anchors.not_newer + 1 AND anchors.not_newer + ?)
+        )
+        SELECT timestamp, sender, name, content, is_from_me, jid, id, media_type
+        FROM windows
+        ORDER BY pos, part, CASE WHEN part = 0 THEN -rn ELSE rn END
+    """, tuple(params))
+    
+    return [
+        dataclass_to_dict(Message(
+            timestamp=datetime.fromisoformat(msg[0]),
+            sender=msg[1],
+            chat_name=msg[2],
+            content=msg[3],
+            is_from_me=msg[4],
+            chat_jid=msg[5],
+            id=msg[6],
+            media_type=msg[7]
+        ))
+        for msg in _iter_rows(cursor)
+    ]
+
+
 def get_message_context(
     message_id: str,
     before: int = 5,
@@ -396,10 +468,9 @@ def list_chats(
         params.extend([limit, offset])
         
         cursor.execute(" ".join(query_parts), tuple(params))
-        chats = cursor.fetchall()
         
         result = []
-        for chat_data in chats:
+        for chat_data in _iter_rows(cursor):
             chat = Chat(
                 jid=chat_data[0],
                 name=chat_data[1],
@@ -513,7 +584,7 @@ def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Chat]:
             conn.close()
 
 
-def get_last_interaction(jid: str) -> str:
+def get_last_interaction(jid: str) -> Optional[str]:
     """Get most recent message involving the contact."""
     try:
         conn = sqlite3.connect(MESSAGES_DB_PATH)
@@ -664,7 +735,7 @@ def send_message(recipient: str, message: str) -> Tuple[bool, str]:
             "message": message,
         }
         
-        response = requests.post(url, json=payload)
+        response = _bridge.post(url, json=payload)
         
         # Check if the request was successful
         if response.status_code == 200:
@@ -698,7 +769,7 @@ def send_file(recipient: str, media_path: str) -> Tuple[bool, str]:
             "media_path": media_path
         }
         
-        response = requests.post(url, json=payload)
+        response = _bridge.post(url, json=payload)
         
         # Check if the request was successful
         if response.status_code == 200:
@@ -738,7 +809,7 @@ def send_audio_message(recipient: str, media_path: str) -> Tuple[bool, str]:
             "media_path": media_path
         }
         
-        response = requests.post(url, json=payload)
+        response = _bridge.post(url, json=payload)
         
         # Check if the request was successful
         if response.status_code == 200:
@@ -771,7 +842,7 @@ def download_media(message_id: str, chat_jid: str) -> Optional[str]:
             "chat_jid": chat_jid
         }
         
-        response = requests.post(url, json=payload)
+        response = _bridge.post(url, json=payload)
         
         if response.status_code == 200:
             result = response.json()